@@ -4,62 +4,23 @@ from typing import List, Optional, Dict, Any
 
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from shapely.geometry import box, shape
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
 from .db import get_session
 from .geocode import geocode_address
-from .geo_layers import BoundaryLayer
-from .models import CheckLog, CheckRequest, CheckResult
-from .util import normalize_address
+from .layers import CUSTOM, LAYERS, MPR, MUNICIPALITIES, NSC, missing_reason, province_of, result_confidence
+from .models import AreaQuery, CheckLog, CheckRequest, CheckResult
+from .util import canonical_address, normalize_address
 from .arcgis_fetch import fetch_arcgis_layer_to_geojson
+from .area import logs_in_area
+from .tiles import get_tile
 
 router = APIRouter(prefix="/api")
 
-# Layer config: we make name_keys inclusive so it works with many exports.
-MUNICIPALITIES = BoundaryLayer(
-    folder=settings.municipalities_dir,
-    name_keys=["MUNICNAME", "municname", "MUNICNAME", "municipality", "name", "NAME"],
-    extras_keys=["PROVINCE", "provname", "province", "PROVNAME"],
-)
-
-# NSC (North/South/Central) often comes from the Zoning layer (MapServer/28).
-# That layer uses SCHEMENAME and REGION as described in the ArcGIS layer docs.
-NSC = BoundaryLayer(
-    folder=settings.nsc_regions_dir,
-    name_keys=[
-        "SCHEMENAME",
-        "SCHEME",
-        "REGION",
-        "REGION_NAME",
-        "REGIONDESC",
-        "REGION_DESC",
-        "REGION_FULL",
-        "REGIONFULL",
-        "REGIONTEXT",
-        "REGION_TEXT",
-        "NAME",
-        "name",
-        "REGIONLABEL",
-        "REGION_LABEL",
-    ],
-    extras_keys=[],
-)
-
-# MPR (Municipal Planning Regions) commonly uses a name field like FUNC_DISTR.
-MPR = BoundaryLayer(
-    folder=settings.mpr_regions_dir,
-    name_keys=["REGION", "REGION_NAME", "NAME", "name", "FUNC_DISTR", "FUNC_DIST", "PLANNING_R", "PLANNING_REGION"],
-    extras_keys=[],
-)
-
-CUSTOM = BoundaryLayer(
-    folder=settings.custom_regions_dir,
-    name_keys=["REGION", "REGION_NAME", "NAME", "name", "LABEL", "label"],
-    extras_keys=[],
-)
-
 
 @router.get("/health")
 def health():
@@ -71,6 +32,7 @@ async def check_address(payload: CheckRequest, session: Session = Depends(get_se
     addr = normalize_address(payload.address)
     if not addr:
         raise HTTPException(status_code=400, detail="Address is required")
+    canon = canonical_address(addr)
 
     lat: Optional[float] = payload.lat
     lon: Optional[float] = payload.lon
@@ -95,11 +57,13 @@ async def check_address(payload: CheckRequest, session: Session = Depends(get_se
                 mpr_region=None,
                 custom_region=None,
                 confidence=0.0,
-                reason="Could not geocode address. Provide lat/lon or enable geocoder.",
+                reason="Could not geocode address. Provide lat/lon, build the gazetteer or enable Nominatim.",
             )
             session.add(
                 CheckLog(
                     address=addr,
+                    address_key=canon.key,
+                    postal_code=canon.postcode,
                     normalized_address=None,
                     lat=None,
                     lon=None,
@@ -130,11 +94,7 @@ async def check_address(payload: CheckRequest, session: Session = Depends(get_se
     custom_hit = CUSTOM.query(lat_f, lon_f)
 
     municipality = mun_hit.name if mun_hit else None
-    province = None
-    if mun_hit:
-        province = mun_hit.extras.get("PROVINCE") or mun_hit.extras.get("provname") or mun_hit.extras.get("province")
-        if province is not None:
-            province = str(province).strip() or None
+    province = province_of(mun_hit)
 
     nsc_region = nsc_hit.name if nsc_hit else None
     mpr_region = mpr_hit.name if mpr_hit else None
@@ -151,8 +111,7 @@ async def check_address(payload: CheckRequest, session: Session = Depends(get_se
         missing.append("MPR")
     if not custom_hit:
         missing.append("custom")
-    if missing:
-        reason = "No match for: " + ", ".join(missing) + ". If this is unexpected, refresh/download datasets."
+    reason = missing_reason(missing)
 
     res = CheckResult(
         ok=ok,
@@ -165,13 +124,15 @@ async def check_address(payload: CheckRequest, session: Session = Depends(get_se
         nsc_region=nsc_region,
         mpr_region=mpr_region,
         custom_region=custom_region,
-        confidence=float(confidence if ok else max(0.1, confidence)),
+        confidence=result_confidence(confidence, ok),
         reason=reason,
     )
 
     session.add(
         CheckLog(
             address=addr,
+            address_key=canon.key,
+            postal_code=canon.postcode,
             normalized_address=normalized,
             lat=lat_f,
             lon=lon_f,
@@ -196,6 +157,85 @@ def history(limit: int = 50, session: Session = Depends(get_session)):
     return list(session.exec(stmt).all())
 
 
+@router.post("/history/area", response_model=List[CheckLog])
+def history_area(payload: AreaQuery, session: Session = Depends(get_session)):
+    """Logged checks inside a bbox, a GeoJSON polygon or a named layer feature, optionally within a time range."""
+    given = [payload.bbox is not None, payload.polygon is not None, payload.layer is not None]
+    if sum(given) != 1:
+        raise HTTPException(status_code=400, detail="Provide exactly one of bbox, polygon or layer+feature")
+
+    if payload.bbox is not None:
+        if len(payload.bbox) != 4:
+            raise HTTPException(status_code=400, detail="bbox must be [min_lon, min_lat, max_lon, max_lat]")
+        minx, miny, maxx, maxy = (float(v) for v in payload.bbox)
+        if minx > maxx or miny > maxy:
+            raise HTTPException(status_code=400, detail="bbox must be [min_lon, min_lat, max_lon, max_lat]")
+        area = box(minx, miny, maxx, maxy)
+    elif payload.polygon is not None:
+        try:
+            area = shape(payload.polygon)
+        except Exception:
+            raise HTTPException(status_code=400, detail="polygon must be a GeoJSON geometry")
+        if area.geom_type not in ("Polygon", "MultiPolygon") or area.is_empty:
+            raise HTTPException(status_code=400, detail="polygon must be a GeoJSON Polygon or MultiPolygon")
+    else:
+        bl = LAYERS.get(payload.layer or "")
+        if bl is None:
+            raise HTTPException(status_code=400, detail="Invalid layer. Use " + "|".join(LAYERS))
+        if not payload.feature:
+            raise HTTPException(status_code=400, detail="feature is required with layer")
+        area = bl.feature_geometry(payload.feature)
+        if area is None:
+            raise HTTPException(status_code=404, detail="Unknown feature")
+
+    limit = max(1, min(5000, int(payload.limit)))
+    return logs_in_area(session, area, since=payload.since, until=payload.until, limit=limit)
+
+
+@router.get("/tiles")
+def tile_layers():
+    """Tile URL templates per layer. `v` pins the dataset version so tiles can be cached as immutable."""
+    out: Dict[str, Any] = {}
+    for key, layer in LAYERS.items():
+        version = layer.snapshot().version
+        out[key] = {
+            "version": version,
+            "url": f"/api/tiles/{key}/{{z}}/{{x}}/{{y}}.geojson?v={version}",
+            "max_zoom": settings.tile_max_zoom,
+        }
+    return {"layers": out}
+
+
+@router.get("/tiles/{layer}/{z}/{x}/{y}.geojson")
+def tile(
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    v: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    bl = LAYERS.get(layer)
+    if bl is None:
+        raise HTTPException(status_code=404, detail="Unknown layer")
+    n = 1 << z if 0 <= z <= settings.tile_max_zoom else 0
+    if not (0 <= x < n and 0 <= y < n):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    version, data = get_tile(layer, bl, z, x, y)
+    etag = f'"{version}-{z}-{x}-{y}"'
+    headers = {"ETag": etag}
+    if v == version:
+        # Versioned URL: the content can never change, so browsers/proxies never need to ask again.
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        headers["Cache-Control"] = "public, max-age=60, must-revalidate"
+
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type="application/geo+json", headers=headers)
+
+
 @router.post("/admin/refresh-datasets")
 async def admin_refresh(
     which: str = "all",
@@ -230,6 +270,7 @@ async def admin_refresh(
         out_path = str(Path(settings.municipalities_dir) / "ethekwini_municipality.json")
         res = await fetch_arcgis_layer_to_geojson(url, out_path)
         out["municipality"] = {"features": res.feature_count, "file": res.output_geojson_path}
+        await run_in_threadpool(MUNICIPALITIES.reload)
 
     async def _refresh_nsc():
         url = (settings.ethekwini_nsc_layer_url or "").strip()
@@ -238,6 +279,7 @@ async def admin_refresh(
         out_path = str(Path(settings.nsc_regions_dir) / "ethekwini_nsc.json")
         res = await fetch_arcgis_layer_to_geojson(url, out_path)
         out["nsc"] = {"features": res.feature_count, "file": res.output_geojson_path}
+        await run_in_threadpool(NSC.reload)
 
     async def _refresh_mpr():
         url = (settings.ethekwini_mpr_layer_url or "").strip()
@@ -246,6 +288,7 @@ async def admin_refresh(
         out_path = str(Path(settings.mpr_regions_dir) / "ethekwini_mpr.json")
         res = await fetch_arcgis_layer_to_geojson(url, out_path)
         out["mpr"] = {"features": res.feature_count, "file": res.output_geojson_path}
+        await run_in_threadpool(MPR.reload)
 
     if which_l == "all":
         await _refresh_municipality()
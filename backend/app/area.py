@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import heapq
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from sqlalchemy import Integer, text
+from sqlmodel import Session, select
+
+from .db import CHECKLOG_RTREE, use_rtree
+from .models import CheckLog
+
+_BATCH = 10000
+
+
+def logs_in_area(
+    session: Session,
+    area: Any,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 500,
+) -> List[CheckLog]:
+    """Newest-first CheckLog rows whose point lies in `area` (shapely geometry, boundary included).
+
+    Candidates come from the R*Tree (bbox overlap; SQLite stores float32 boxes rounded outward, so this is
+    a superset) in one streamed pass of (id, lon, lat, created_at). Points are tested exactly against
+    `area` in batches, the newest `limit` matches are kept, and only those rows are loaded in full.
+    """
+
+    minx, miny, maxx, maxy = area.bounds
+    stmt = select(CheckLog.id, CheckLog.lon, CheckLog.lat, CheckLog.created_at)
+    if use_rtree():
+        stmt = stmt.where(
+            CheckLog.id.in_(
+                text(
+                    f"SELECT id FROM {CHECKLOG_RTREE} "
+                    "WHERE max_lon >= :minx AND min_lon <= :maxx AND max_lat >= :miny AND min_lat <= :maxy"
+                )
+                .bindparams(minx=minx, maxx=maxx, miny=miny, maxy=maxy)
+                .columns(id=Integer)
+            )
+        )
+    else:
+        stmt = stmt.where(CheckLog.lon.between(minx, maxx), CheckLog.lat.between(miny, maxy))
+    if since is not None:
+        stmt = stmt.where(CheckLog.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(CheckLog.created_at < until)
+
+    shapely.prepare(area)
+    # Min-heap of (created_at, id) holding the newest `limit` matches seen so far.
+    newest: List[Tuple[datetime, int]] = []
+    for part in session.exec(stmt).partitions(_BATCH):
+        lons = np.array([r[1] for r in part], dtype=float)
+        lats = np.array([r[2] for r in part], dtype=float)
+        inside = shapely.intersects_xy(area, lons, lats)
+        for r, ok in zip(part, inside.tolist()):
+            if not ok:
+                continue
+            item = (r[3], r[0])
+            if len(newest) < limit:
+                heapq.heappush(newest, item)
+            elif item > newest[0]:
+                heapq.heapreplace(newest, item)
+
+    if not newest:
+        return []
+    rows = session.exec(
+        select(CheckLog)
+        .where(CheckLog.id.in_([i for _, i in newest]))
+        .order_by(CheckLog.created_at.desc(), CheckLog.id.desc())
+    ).all()
+    return list(rows)
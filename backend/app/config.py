@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     mpr_regions_dir: str = "./data/mpr_regions"
     custom_regions_dir: str = "./data/custom_regions"
 
+    # Boundary tiles for the map (GET /api/tiles/...). Rendered on demand, cached in memory (LRU) and on disk.
+    tile_cache_dir: str = "./data/tile_cache"
+    tile_cache_size: int = 512
+    tile_max_zoom: int = 16
+
     # Live refresh security
     # If empty, admin refresh endpoints are disabled.
     admin_token: str = ""
@@ -28,6 +33,13 @@ class Settings(BaseSettings):
     nominatim_user_agent: str = "municipality-address-check/1.0 (contact: you@example.com)"
     request_timeout_s: float = 20.0
 
+    # Local gazetteer (offline address-point geocoder, built by scripts.build_gazetteer).
+    # Looked up before Nominatim; Nominatim (if allowed) only sees local misses.
+    use_gazetteer: bool = True
+    gazetteer_dir: str = "./data/gazetteer"
+    gazetteer_db_path: str = "./data/gazetteer.sqlite"
+    gazetteer_min_similarity: float = 0.5
+
     model_config = SettingsConfigDict(env_prefix="MAC_", env_file=".env", extra="ignore")
 
 
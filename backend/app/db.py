@@ -1,11 +1,71 @@
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, create_engine, Session
 from .config import settings
 
 engine = create_engine(settings.db_url, echo=False, connect_args={"check_same_thread": False})
 
 
+def _add_missing_columns() -> None:
+    """create_all() never alters existing tables; add new nullable columns (and their indexes) in place."""
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing or not col.nullable:
+                    continue
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{col.name}" {col_type}'))
+            for ix in table.indexes:
+                ix.create(conn, checkfirst=True)
+
+
+# SQLite R*Tree over logged check points (lon/lat as degenerate boxes), kept in sync by triggers.
+CHECKLOG_RTREE = "checklog_rtree"
+_RTREE_DDL = [
+    f"CREATE VIRTUAL TABLE {CHECKLOG_RTREE} USING rtree(id, min_lon, max_lon, min_lat, max_lat)",
+    f"""CREATE TRIGGER IF NOT EXISTS checklog_rtree_ai AFTER INSERT ON checklog
+        WHEN NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL
+        BEGIN INSERT INTO {CHECKLOG_RTREE} VALUES (NEW.id, NEW.lon, NEW.lon, NEW.lat, NEW.lat); END""",
+    f"""CREATE TRIGGER IF NOT EXISTS checklog_rtree_au AFTER UPDATE OF lat, lon ON checklog
+        BEGIN
+            DELETE FROM {CHECKLOG_RTREE} WHERE id = OLD.id;
+            INSERT INTO {CHECKLOG_RTREE}
+                SELECT NEW.id, NEW.lon, NEW.lon, NEW.lat, NEW.lat WHERE NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL;
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS checklog_rtree_ad AFTER DELETE ON checklog
+        BEGIN DELETE FROM {CHECKLOG_RTREE} WHERE id = OLD.id; END""",
+]
+
+
+def use_rtree() -> bool:
+    return engine.dialect.name == "sqlite"
+
+
+def _ensure_checklog_rtree() -> None:
+    if not use_rtree():
+        return
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHECKLOG_RTREE,)
+        ).first()
+        if exists:
+            return
+        for stmt in _RTREE_DDL:
+            conn.exec_driver_sql(stmt)
+        # Backfill rows logged before the index existed.
+        conn.exec_driver_sql(
+            f"INSERT INTO {CHECKLOG_RTREE} SELECT id, lon, lon, lat, lat FROM checklog "
+            "WHERE lat IS NOT NULL AND lon IS NOT NULL"
+        )
+
+
 def init_db() -> None:
+    _add_missing_columns()
     SQLModel.metadata.create_all(engine)
+    _ensure_checklog_rtree()
 
 
 def get_session():
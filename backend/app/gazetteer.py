@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .config import settings
+from .util import address_key
+
+
+@dataclass(frozen=True)
+class GazetteerHit:
+    display_name: str
+    lat: float
+    lon: float
+    score: float
+    match: str  # exact|prefix|fuzzy
+
+
+# Address point exports use all sorts of column names; first match wins (same idea as BoundaryLayer name_keys).
+ADDRESS_KEYS = ["ADDRESS", "address", "FULL_ADDRESS", "full_address", "FULLADDR", "ADDR", "addr", "STREET_ADDRESS"]
+ADDRESS_PART_KEYS = [
+    ["STREET_NO", "STREETNO", "STR_NO", "HOUSE_NO", "housenumber", "addr:housenumber", "number"],
+    ["STREET_NAME", "STREETNAME", "STR_NAME", "street", "addr:street"],
+    ["SUBURB", "suburb", "addr:suburb"],
+    ["TOWN", "CITY", "city", "addr:city"],
+]
+LAT_KEYS = ["lat", "LAT", "latitude", "LATITUDE", "y", "Y"]
+LON_KEYS = ["lon", "LON", "lng", "LNG", "longitude", "LONGITUDE", "x", "X"]
+
+# How many of the query's rarest trigrams are used to collect fuzzy candidates.
+_CANDIDATE_TRIGRAMS = 8
+_CANDIDATE_LIMIT = 50
+_BATCH = 5000
+
+
+def trigrams(key: str) -> Set[str]:
+    # Pad like pg_trgm so short words and word starts still produce trigrams.
+    t = f"  {key} "
+    return {t[i : i + 3] for i in range(len(t) - 2)}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / float(len(a) + len(b) - shared)
+
+
+def _pick_first(props: Dict[str, Any], keys: List[str]) -> Optional[str]:
+    for k in keys:
+        if k in props and props[k] is not None:
+            s = str(props[k]).strip()
+            if s:
+                return s
+    return None
+
+
+def _address_from_props(props: Dict[str, Any]) -> Optional[str]:
+    full = _pick_first(props, ADDRESS_KEYS)
+    if full:
+        return full
+    parts = [_pick_first(props, keys) for keys in ADDRESS_PART_KEYS]
+    if not parts[1]:
+        return None
+    head = " ".join(p for p in parts[:2] if p)
+    return ", ".join([head] + [p for p in parts[2:] if p])
+
+
+def _coord(props: Dict[str, Any], keys: List[str]) -> Optional[float]:
+    v = _pick_first(props, keys)
+    if v is None:
+        return None
+    try:
+        return float(v)
+    except ValueError:
+        return None
+
+
+def _iter_csv(p: Path) -> Iterator[Tuple[str, float, float]]:
+    with p.open("r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            addr = _address_from_props(row)
+            lat = _coord(row, LAT_KEYS)
+            lon = _coord(row, LON_KEYS)
+            if addr and lat is not None and lon is not None:
+                yield addr, lat, lon
+
+
+def _iter_geojson(p: Path) -> Iterator[Tuple[str, float, float]]:
+    with p.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    feats = data.get("features") if isinstance(data, dict) else None
+    for feat in feats or []:
+        if not isinstance(feat, dict):
+            continue
+        props = feat.get("properties") or feat.get("attributes") or {}
+        addr = _address_from_props(props)
+        if not addr:
+            continue
+        geom = feat.get("geometry") or {}
+        if geom.get("type") == "Point":
+            lon, lat = geom["coordinates"][:2]
+        elif "x" in geom and "y" in geom:
+            # ESRI JSON point
+            lon, lat = geom["x"], geom["y"]
+        else:
+            lat, lon = _coord(props, LAT_KEYS), _coord(props, LON_KEYS)
+            if lat is None or lon is None:
+                continue
+        yield addr, float(lat), float(lon)
+
+
+def iter_address_points(folder: str) -> Iterator[Tuple[str, float, float]]:
+    path = Path(folder)
+    for p in sorted(path.glob("*.csv")):
+        yield from _iter_csv(p)
+    for p in sorted(list(path.glob("*.geojson")) + list(path.glob("*.json"))):
+        yield from _iter_geojson(p)
+
+
+_SCHEMA = """
+CREATE TABLE address (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    display TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL
+);
+CREATE TABLE trigram (
+    tri TEXT NOT NULL,
+    address_id INTEGER NOT NULL,
+    PRIMARY KEY (tri, address_id)
+) WITHOUT ROWID;
+CREATE TABLE trigram_df (
+    tri TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def build_index(folder: str, db_path: str) -> int:
+    """Ingest every address-point file in `folder` into a fresh SQLite index at `db_path`.
+
+    The index is written to a temp file and swapped in, so running lookups never see a half-built index.
+    Returns the number of address points indexed.
+    """
+
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    con = sqlite3.connect(tmp_path)
+    try:
+        con.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + _SCHEMA)
+        count = 0
+        addr_rows: List[Tuple[int, str, str, float, float]] = []
+        tri_rows: List[Tuple[str, int]] = []
+
+        def flush() -> None:
+            con.executemany("INSERT INTO address VALUES (?, ?, ?, ?, ?)", addr_rows)
+            con.executemany("INSERT OR IGNORE INTO trigram VALUES (?, ?)", tri_rows)
+            addr_rows.clear()
+            tri_rows.clear()
+
+        for display, lat, lon in iter_address_points(folder):
+            key = address_key(display)
+            if not key:
+                continue
+            count += 1
+            addr_rows.append((count, key, display, lat, lon))
+            tri_rows.extend((t, count) for t in trigrams(key))
+            if len(addr_rows) >= _BATCH:
+                flush()
+        flush()
+
+        # Indexes after the bulk insert are much cheaper than maintaining them row by row.
+        con.executescript(
+            """
+            CREATE INDEX ix_address_key ON address(key);
+            INSERT INTO trigram_df SELECT tri, COUNT(*) FROM trigram GROUP BY tri;
+            ANALYZE;
+            """
+        )
+        con.commit()
+    finally:
+        con.close()
+
+    os.replace(tmp_path, db_path)
+    return count
+
+
+class Gazetteer:
+    """Read side of the on-disk address index built by `build_index`."""
+
+    def __init__(self, db_path: str, min_similarity: float = 0.5):
+        self.db_path = db_path
+        self.min_similarity = min_similarity
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not Path(self.db_path).is_file():
+            return None
+        # A fresh read-only connection per lookup is cheap and picks up rebuilt indexes without a restart.
+        return sqlite3.connect(f"file:{Path(self.db_path).resolve().as_posix()}?mode=ro", uri=True)
+
+    def lookup(self, address: str) -> Optional[GazetteerHit]:
+        key = address_key(address)
+        if not key:
+            return None
+        con = self._connect()
+        if con is None:
+            return None
+        try:
+            row = con.execute(
+                "SELECT display, lat, lon FROM address WHERE key = ? ORDER BY id LIMIT 1", (key,)
+            ).fetchone()
+            if row:
+                return GazetteerHit(display_name=row[0], lat=row[1], lon=row[2], score=0.95, match="exact")
+
+            # Typed a prefix of a known address, e.g. without suburb/town. Only trusted when the prefix names
+            # one place: "12 smith street" in two towns is ambiguous, and guessing one would skip Nominatim.
+            rows = con.execute(
+                """
+                SELECT MIN(display), lat, lon FROM address
+                WHERE key >= ? AND key < ? GROUP BY key, lat, lon ORDER BY key LIMIT 2
+                """,
+                (key + " ", key + " \uffff"),
+            ).fetchall()
+            if len(rows) == 1:
+                row = rows[0]
+                return GazetteerHit(display_name=row[0], lat=row[1], lon=row[2], score=0.85, match="prefix")
+            if rows:
+                # Fuzzy matching would pick between the same candidates just as arbitrarily.
+                return None
+
+            return self._fuzzy(con, key)
+        finally:
+            con.close()
+
+    def _fuzzy(self, con: sqlite3.Connection, key: str) -> Optional[GazetteerHit]:
+        q_tris = trigrams(key)
+        marks = ",".join("?" * len(q_tris))
+        # Very common trigrams (e.g. " st") would pull in most of the table; seed from the rarest ones only.
+        rare = [
+            r[0]
+            for r in con.execute(
+                f"SELECT tri FROM trigram_df WHERE tri IN ({marks}) ORDER BY n LIMIT ?",
+                (*q_tris, _CANDIDATE_TRIGRAMS),
+            )
+        ]
+        if not rare:
+            return None
+
+        marks = ",".join("?" * len(rare))
+        cands = con.execute(
+            f"""
+            SELECT a.key, a.display, a.lat, a.lon
+            FROM address a
+            JOIN (
+                SELECT address_id, COUNT(*) AS hits FROM trigram
+                WHERE tri IN ({marks}) GROUP BY address_id ORDER BY hits DESC LIMIT ?
+            ) c ON c.address_id = a.id
+            """,
+            (*rare, _CANDIDATE_LIMIT),
+        ).fetchall()
+
+        best: Optional[Tuple[float, Tuple[str, str, float, float]]] = None
+        for cand in cands:
+            sim = _similarity(q_tris, trigrams(cand[0]))
+            if best is None or sim > best[0]:
+                best = (sim, cand)
+        if best is None or best[0] < self.min_similarity:
+            return None
+        sim, (_, display, lat, lon) = best
+        return GazetteerHit(display_name=display, lat=lat, lon=lon, score=min(0.8, sim), match="fuzzy")
+
+
+GAZETTEER = Gazetteer(settings.gazetteer_db_path, settings.gazetteer_min_similarity)
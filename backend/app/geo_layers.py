@@ -2,22 +2,33 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import hashlib
 import json
+import sys
+import threading
 
-from shapely.geometry import LinearRing, Point, Polygon, shape
-from shapely.prepared import prep
+import numpy as np
+import shapely
+from shapely import STRtree
+from shapely.geometry import LinearRing, Polygon, shape
 
 
 @dataclass(frozen=True)
 class LayerFeature:
+    """One polygon part of a layer. Only materialized for query results (see FeatureStore)."""
+
     name: str
     extras: Dict[str, Any]
-    prepared: Any
+    geometry: Any  # shapely geometry, prepared in place
     bbox: Tuple[float, float, float, float]
 
 
+# Loader output: (name, extras, geometry) per polygon part.
+_Row = Tuple[str, Dict[str, Any], Any]
+
+
 def _guess_name_from_filename(p: Path) -> str:
     return p.stem.replace("_", " ").replace("-", " ").strip()
 
@@ -55,8 +66,8 @@ def _esri_rings_to_polygons(rings: List[List[List[float]]]) -> List[Polygon]:
     return polys
 
 
-def _load_geojson(data: dict, fallback_name: str, name_keys: List[str], extras_keys: List[str]) -> List[LayerFeature]:
-    out: List[LayerFeature] = []
+def _load_geojson(data: dict, fallback_name: str, name_keys: List[str], extras_keys: List[str]) -> List[_Row]:
+    out: List[_Row] = []
 
     def add(geom_obj: dict, props: Dict[str, Any]):
         shp = shape(geom_obj)
@@ -64,7 +75,7 @@ def _load_geojson(data: dict, fallback_name: str, name_keys: List[str], extras_k
             return
         name = _pick_first(props, name_keys, fallback_name) or fallback_name
         extras = {k: props.get(k) for k in extras_keys if props.get(k) is not None}
-        out.append(LayerFeature(name=name, extras=extras, prepared=prep(shp), bbox=shp.bounds))
+        out.append((name, extras, shp))
 
     t = data.get("type")
     if t == "FeatureCollection":
@@ -89,8 +100,8 @@ def _load_geojson(data: dict, fallback_name: str, name_keys: List[str], extras_k
     return out
 
 
-def _load_esri_json(data: dict, fallback_name: str, name_keys: List[str], extras_keys: List[str]) -> List[LayerFeature]:
-    out: List[LayerFeature] = []
+def _load_esri_json(data: dict, fallback_name: str, name_keys: List[str], extras_keys: List[str]) -> List[_Row]:
+    out: List[_Row] = []
     feats = data.get("features")
     if not isinstance(feats, list):
         return out
@@ -106,54 +117,243 @@ def _load_esri_json(data: dict, fallback_name: str, name_keys: List[str], extras
         name = _pick_first(attrs, name_keys, fallback_name) or fallback_name
         extras = {k: attrs.get(k) for k in extras_keys if attrs.get(k) is not None}
         for poly in _esri_rings_to_polygons(rings):
-            out.append(LayerFeature(name=name, extras=extras, prepared=prep(poly), bbox=poly.bounds))
+            out.append((name, extras, poly))
 
     return out
 
 
+def read_rows(folder: str, name_keys: List[str], extras_keys: List[str]) -> Tuple[List[_Row], str]:
+    """Parse every dataset file in `folder` into (name, extras, geometry) rows plus the dataset version."""
+    path = Path(folder)
+    path.mkdir(parents=True, exist_ok=True)
+    rows: List[_Row] = []
+
+    files = sorted(list(path.glob("*.geojson")) + list(path.glob("*.json")))
+    # Dataset version: changes whenever a source file is added, removed or rewritten.
+    h = hashlib.sha1()
+    for p in files:
+        st = p.stat()
+        h.update(f"{p.name}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+
+    for p in files:
+        with p.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        fallback_name = _guess_name_from_filename(p)
+
+        g = _load_geojson(data, fallback_name, name_keys, extras_keys)
+        if g:
+            rows.extend(g)
+            continue
+        e = _load_esri_json(data, fallback_name, name_keys, extras_keys)
+        if e:
+            rows.extend(e)
+            continue
+
+    return rows, h.hexdigest()[:12]
+
+
+def _extras_key(extras: Dict[str, Any]) -> str:
+    return json.dumps(extras, sort_keys=True, default=str)
+
+
+class FeatureStore:
+    """Struct-of-arrays storage for a loaded layer.
+
+    Row i is one polygon part: its bbox lives in four float64 columns, its geometry in an object array
+    (prepared in place), and its name / extras as int32 ids into interned tables, so parts of the same
+    ESRI feature (and features sharing a name) don't duplicate strings or dicts.
+    """
+
+    __slots__ = (
+        "version", "minx", "miny", "maxx", "maxy", "geoms", "name_id", "extras_id", "names", "extras", "_tree"
+    )
+
+    def __init__(self, rows: List[_Row], version: str = ""):
+        # Dataset version travels with the data it describes (tile cache keys depend on that).
+        self.version = version
+        name_ids: Dict[str, int] = {}
+        extras_ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.extras: List[Dict[str, Any]] = []
+        name_col = np.empty(len(rows), dtype=np.int32)
+        extras_col = np.empty(len(rows), dtype=np.int32)
+
+        for i, (name, extras, _) in enumerate(rows):
+            nid = name_ids.get(name)
+            if nid is None:
+                nid = name_ids[name] = len(self.names)
+                self.names.append(name)
+            ek = _extras_key(extras)
+            eid = extras_ids.get(ek)
+            if eid is None:
+                eid = extras_ids[ek] = len(self.extras)
+                self.extras.append(extras)
+            name_col[i] = nid
+            extras_col[i] = eid
+
+        self.name_id = name_col
+        self.extras_id = extras_col
+        self.geoms = np.empty(len(rows), dtype=object)
+        self.geoms[:] = [g for _, _, g in rows]
+        shapely.prepare(self.geoms)
+        bounds = shapely.bounds(self.geoms).reshape(-1, 4)
+        # Separate contiguous columns: the per-point bbox test is four vectorized compares.
+        self.minx, self.miny, self.maxx, self.maxy = (np.ascontiguousarray(bounds[:, k]) for k in range(4))
+        self._tree: Optional[STRtree] = None
+
+    def __len__(self) -> int:
+        return len(self.geoms)
+
+    def feature(self, i: int) -> LayerFeature:
+        return LayerFeature(
+            name=self.names[self.name_id[i]],
+            extras=self.extras[self.extras_id[i]],
+            geometry=self.geoms[i],
+            bbox=(float(self.minx[i]), float(self.miny[i]), float(self.maxx[i]), float(self.maxy[i])),
+        )
+
+    def tree(self) -> STRtree:
+        if self._tree is None:
+            self._tree = STRtree(self.geoms)
+        return self._tree
+
+    def features_in_bbox(self, bbox: Tuple[float, float, float, float]) -> List[LayerFeature]:
+        """Features whose geometry intersects the lon/lat bbox, in layer order."""
+        if not len(self):
+            return []
+        idx = self.tree().query(shapely.box(*bbox), predicate="intersects")
+        return [self.feature(i) for i in sorted(idx.tolist())]
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Approximate per-column breakdown (sys.getsizeof; shapely wrappers and GEOS memory excluded).
+
+        scripts.layer_memory measures whole-load totals with tracemalloc.
+        """
+        arrays = sum(a.nbytes for a in (self.minx, self.miny, self.maxx, self.maxy, self.name_id, self.extras_id))
+        geom_refs = self.geoms.nbytes
+        names = sys.getsizeof(self.names) + sum(sys.getsizeof(n) for n in self.names)
+        extras = sys.getsizeof(self.extras) + sum(
+            sys.getsizeof(d) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in d.items()) for d in self.extras
+        )
+        total = arrays + geom_refs + names + extras
+        n = len(self)
+        return {
+            "features": n,
+            "names": len(self.names),
+            "extras": len(self.extras),
+            "bytes": {"arrays": arrays, "geometry_refs": geom_refs, "names": names, "extras": extras, "total": total},
+            "bytes_per_feature": round(total / n, 1) if n else 0.0,
+        }
+
+
 class BoundaryLayer:
     def __init__(self, folder: str, name_keys: List[str], extras_keys: List[str]):
         self.folder = folder
         self.name_keys = name_keys
         self.extras_keys = extras_keys
         self._loaded = False
-        self._features: List[LayerFeature] = []
+        self._load_lock = threading.Lock()
+        # Data + version, published as one object on (re)load so readers always see a consistent snapshot.
+        self._store = FeatureStore([])
+
+    @property
+    def version(self) -> str:
+        return self._store.version
 
     def load(self) -> None:
         if self._loaded:
             return
-        path = Path(self.folder)
-        path.mkdir(parents=True, exist_ok=True)
-        feats: List[LayerFeature] = []
-
-        files = list(path.glob("*.geojson")) + list(path.glob("*.json"))
-        for p in sorted(files):
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            fallback_name = _guess_name_from_filename(p)
-
-            g = _load_geojson(data, fallback_name, self.name_keys, self.extras_keys)
-            if g:
-                feats.extend(g)
-                continue
-            e = _load_esri_json(data, fallback_name, self.name_keys, self.extras_keys)
-            if e:
-                feats.extend(e)
-                continue
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._store = self._read()
+            self._loaded = True
 
-        self._features = feats
-        self._loaded = True
+    def reload(self) -> None:
+        """Re-read the folder (e.g. after a dataset refresh).
+
+        The old snapshot keeps serving queries until the new one is fully built.
+        """
+        with self._load_lock:
+            self._store = self._read()
+            self._loaded = True
+
+    def snapshot(self) -> FeatureStore:
+        """The current data; use one snapshot for work that must not mix dataset versions."""
+        self.load()
+        return self._store
+
+    def _read(self) -> FeatureStore:
+        rows, version = read_rows(self.folder, self.name_keys, self.extras_keys)
+        return FeatureStore(rows, version=version)
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._store)
+
+    def memory_report(self) -> Dict[str, Any]:
+        self.load()
+        return self._store.memory_report()
 
     def query(self, lat: float, lon: float) -> Optional[LayerFeature]:
         self.load()
-        if not self._features:
+        st = self._store
+        if not len(st):
             return None
 
-        pt = Point(float(lon), float(lat))
-        for f in self._features:
-            minx, miny, maxx, maxy = f.bbox
-            if not (minx <= pt.x <= maxx and miny <= pt.y <= maxy):
-                continue
-            if f.prepared.contains(pt):
-                return f
-        return None
+        x, y = float(lon), float(lat)
+        cand = np.flatnonzero((st.minx <= x) & (x <= st.maxx) & (st.miny <= y) & (y <= st.maxy))
+        if cand.size == 0:
+            return None
+        hit = np.flatnonzero(shapely.contains_xy(st.geoms[cand], x, y))
+        if hit.size == 0:
+            return None
+        return st.feature(int(cand[hit[0]]))
+
+    def query_many(self, lats: Sequence[float], lons: Sequence[float]) -> List[Optional[LayerFeature]]:
+        """Vectorized `query` for many points at once (same first-match-wins semantics).
+
+        Uses an STRtree over the layer geometries, so the cost is one bulk tree query instead of a
+        Python-level bbox scan per point.
+        """
+        self.load()
+        st = self._store
+        out: List[Optional[LayerFeature]] = [None] * len(lats)
+        if not len(st) or not out:
+            return out
+
+        pts = shapely.points(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+        pt_idx, feat_idx = st.tree().query(pts, predicate="within")
+        if pt_idx.size == 0:
+            return out
+
+        # Several features can contain a point; keep the lowest feature index like the sequential scan does.
+        order = np.lexsort((feat_idx, pt_idx))
+        pt_idx, feat_idx = pt_idx[order], feat_idx[order]
+        first = np.ones(pt_idx.size, dtype=bool)
+        first[1:] = pt_idx[1:] != pt_idx[:-1]
+        # Many points share a few features; materialize each matched feature once.
+        cache: Dict[int, LayerFeature] = {}
+        for i, j in zip(pt_idx[first].tolist(), feat_idx[first].tolist()):
+            f = cache.get(j)
+            if f is None:
+                f = cache[j] = st.feature(j)
+            out[i] = f
+        return out
+
+    def features_in_bbox(self, bbox: Tuple[float, float, float, float]) -> List[LayerFeature]:
+        """Features whose geometry intersects the lon/lat bbox, in layer order."""
+        return self.snapshot().features_in_bbox(bbox)
+
+    def feature_geometry(self, name: str) -> Optional[Any]:
+        """Union of all parts named `name` (exact match first, then case-insensitive), or None."""
+        self.load()
+        st = self._store
+        ids = [i for i, n in enumerate(st.names) if n == name]
+        if not ids:
+            folded = name.casefold()
+            ids = [i for i, n in enumerate(st.names) if n.casefold() == folded]
+        if not ids:
+            return None
+        parts = st.geoms[np.isin(st.name_id, ids)]
+        return parts[0] if len(parts) == 1 else shapely.union_all(parts)
@@ -2,8 +2,10 @@ from dataclasses import dataclass
 from typing import Optional
 
 import httpx
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
+from .gazetteer import GAZETTEER
 
 
 @dataclass(frozen=True)
@@ -14,7 +16,16 @@ class GeocodeHit:
     importance: float
 
 
-async def geocode_address(address: str, country: Optional[str] = None) -> Optional[GeocodeHit]:
+def geocode_local(address: str) -> Optional[GeocodeHit]:
+    if not settings.use_gazetteer:
+        return None
+    hit = GAZETTEER.lookup(address)
+    if not hit:
+        return None
+    return GeocodeHit(display_name=hit.display_name, lat=hit.lat, lon=hit.lon, importance=hit.score)
+
+
+async def geocode_nominatim(address: str, country: Optional[str] = None) -> Optional[GeocodeHit]:
     if not settings.allow_nominatim:
         return None
 
@@ -35,3 +46,12 @@ async def geocode_address(address: str, country: Optional[str] = None) -> Option
             lon=float(hit["lon"]),
             importance=float(hit.get("importance", 0.0)),
         )
+
+
+async def geocode_address(address: str, country: Optional[str] = None) -> Optional[GeocodeHit]:
+    # Local gazetteer first (no network); Nominatim is only a fallback for misses.
+    # The SQLite lookup blocks, so keep it off the event loop.
+    hit = await run_in_threadpool(geocode_local, address)
+    if hit:
+        return hit
+    return await geocode_nominatim(address, country)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from .config import settings
+from .geo_layers import BoundaryLayer, LayerFeature
+
+# Layer config: we make name_keys inclusive so it works with many exports.
+MUNICIPALITIES = BoundaryLayer(
+    folder=settings.municipalities_dir,
+    name_keys=["MUNICNAME", "municname", "MUNICNAME", "municipality", "name", "NAME"],
+    extras_keys=["PROVINCE", "provname", "province", "PROVNAME"],
+)
+
+# NSC (North/South/Central) often comes from the Zoning layer (MapServer/28).
+# That layer uses SCHEMENAME and REGION as described in the ArcGIS layer docs.
+NSC = BoundaryLayer(
+    folder=settings.nsc_regions_dir,
+    name_keys=[
+        "SCHEMENAME",
+        "SCHEME",
+        "REGION",
+        "REGION_NAME",
+        "REGIONDESC",
+        "REGION_DESC",
+        "REGION_FULL",
+        "REGIONFULL",
+        "REGIONTEXT",
+        "REGION_TEXT",
+        "NAME",
+        "name",
+        "REGIONLABEL",
+        "REGION_LABEL",
+    ],
+    extras_keys=[],
+)
+
+# MPR (Municipal Planning Regions) commonly uses a name field like FUNC_DISTR.
+MPR = BoundaryLayer(
+    folder=settings.mpr_regions_dir,
+    name_keys=["REGION", "REGION_NAME", "NAME", "name", "FUNC_DISTR", "FUNC_DIST", "PLANNING_R", "PLANNING_REGION"],
+    extras_keys=[],
+)
+
+CUSTOM = BoundaryLayer(
+    folder=settings.custom_regions_dir,
+    name_keys=["REGION", "REGION_NAME", "NAME", "name", "LABEL", "label"],
+    extras_keys=[],
+)
+
+# Keyed by the CheckLog column each layer classifies into.
+LAYERS: Dict[str, BoundaryLayer] = {
+    "municipality": MUNICIPALITIES,
+    "nsc_region": NSC,
+    "mpr_region": MPR,
+    "custom_region": CUSTOM,
+}
+
+LAYER_LABELS: Dict[str, str] = {
+    "municipality": "municipality",
+    "nsc_region": "NSC",
+    "mpr_region": "MPR",
+    "custom_region": "custom",
+}
+
+
+def missing_reason(missing: List[str]) -> Optional[str]:
+    if not missing:
+        return None
+    return "No match for: " + ", ".join(missing) + ". If this is unexpected, refresh/download datasets."
+
+
+def result_confidence(confidence: float, ok: bool) -> float:
+    # A check without a municipality never reports less than 0.1.
+    return float(confidence if ok else max(0.1, confidence))
+
+
+def province_of(mun_hit: Optional[LayerFeature]) -> Optional[str]:
+    if not mun_hit:
+        return None
+    province = mun_hit.extras.get("PROVINCE") or mun_hit.extras.get("provname") or mun_hit.extras.get("province")
+    if province is None:
+        return None
+    return str(province).strip() or None
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from .api import router as api_router
 from .config import settings
@@ -19,6 +20,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Boundary tiles are GeoJSON text and compress very well.
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
     app.include_router(api_router)
 
     @app.on_event("startup")
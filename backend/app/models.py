@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from sqlmodel import SQLModel, Field
 
 
@@ -32,6 +32,9 @@ class CheckLog(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     address: str
+    # Canonical form of `address` (app.util.canonical_address), for cache/dedupe lookups.
+    address_key: Optional[str] = Field(default=None, index=True)
+    postal_code: Optional[str] = None
     normalized_address: Optional[str] = None
     lat: Optional[float] = None
     lon: Optional[float] = None
@@ -45,3 +48,29 @@ class CheckLog(SQLModel, table=True):
     confidence: float = 0.0
     ok: bool = True
     reason: Optional[str] = None
+
+
+class CheckReclassification(SQLModel, table=True):
+    """One CheckLog column that classifies differently against the current layers (see app.reclassify)."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: str = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    check_id: int = Field(foreign_key="checklog.id", index=True)
+    layer: str
+    old_value: Optional[str] = None
+    new_value: Optional[str] = None
+
+
+class AreaQuery(SQLModel):
+    """Area for /api/history/area: exactly one of bbox, polygon or layer+feature."""
+
+    bbox: Optional[List[float]] = None  # [min_lon, min_lat, max_lon, max_lat]
+    polygon: Optional[Dict[str, Any]] = None  # GeoJSON Polygon/MultiPolygon geometry
+    layer: Optional[str] = None  # municipality|nsc_region|mpr_region|custom_region
+    feature: Optional[str] = None  # feature name within `layer`
+
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    limit: int = 500
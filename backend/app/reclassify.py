@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlmodel import Session, select
+
+from .layers import LAYER_LABELS, LAYERS, MUNICIPALITIES, missing_reason, province_of, result_confidence
+from .models import CheckLog, CheckReclassification
+
+# Columns compared per row; province follows the municipality hit.
+DIFF_COLUMNS = ["municipality", "province", "nsc_region", "mpr_region", "custom_region"]
+
+
+@dataclass
+class LayerDiff:
+    changed: int = 0
+    gained: int = 0  # no match before, match now
+    lost: int = 0  # match before, no match now
+    transitions: Counter = field(default_factory=Counter)
+
+    def as_dict(self, top: int = 20) -> Dict[str, Any]:
+        return {
+            "changed": self.changed,
+            "gained": self.gained,
+            "lost": self.lost,
+            "top_transitions": [
+                {"from": old, "to": new, "count": n} for (old, new), n in self.transitions.most_common(top)
+            ],
+        }
+
+
+@dataclass
+class ReclassifySummary:
+    run_id: str
+    applied: bool
+    rows_checked: int = 0
+    rows_changed: int = 0
+    layers: Dict[str, LayerDiff] = field(default_factory=lambda: {c: LayerDiff() for c in DIFF_COLUMNS})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "applied": self.applied,
+            "rows_checked": self.rows_checked,
+            "rows_changed": self.rows_changed,
+            "layers": {k: v.as_dict() for k, v in self.layers.items()},
+        }
+
+
+def _classify_chunk(lats: List[float], lons: List[float]) -> Dict[str, List[Optional[str]]]:
+    out: Dict[str, List[Optional[str]]] = {}
+    for col, layer in LAYERS.items():
+        hits = layer.query_many(lats, lons)
+        out[col] = [h.name if h else None for h in hits]
+        if layer is MUNICIPALITIES:
+            out["province"] = [province_of(h) for h in hits]
+    return out
+
+
+def reclassify_history(
+    session: Session,
+    chunk_size: int = 5000,
+    apply: bool = False,
+    run_id: Optional[str] = None,
+) -> ReclassifySummary:
+    """Re-run every logged lat/lon against the currently loaded layers.
+
+    Rows are read in id order with keyset pagination, `chunk_size` at a time, as plain tuples, so memory
+    stays flat regardless of table size. Every changed column is recorded as a CheckReclassification row
+    under `run_id`. With `apply=True` the CheckLog rows are also updated to the new classification.
+    """
+
+    summary = ReclassifySummary(run_id=run_id or uuid.uuid4().hex, applied=apply)
+    cols = [getattr(CheckLog, c) for c in DIFF_COLUMNS]
+    last_id = 0
+
+    while True:
+        stmt = (
+            select(CheckLog.id, CheckLog.lat, CheckLog.lon, *cols, CheckLog.ok, CheckLog.confidence)
+            .where(CheckLog.id > last_id, CheckLog.lat.is_not(None), CheckLog.lon.is_not(None))
+            .order_by(CheckLog.id)
+            .limit(chunk_size)
+        )
+        rows: List[Tuple[Any, ...]] = list(session.exec(stmt).all())
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        new = _classify_chunk([r[1] for r in rows], [r[2] for r in rows])
+        now = datetime.utcnow()
+        diffs: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+
+        for i, row in enumerate(rows):
+            row_changed = False
+            for j, col in enumerate(DIFF_COLUMNS):
+                old_v, new_v = row[3 + j], new[col][i]
+                if old_v == new_v:
+                    continue
+                row_changed = True
+                d = summary.layers[col]
+                d.changed += 1
+                d.gained += old_v is None
+                d.lost += new_v is None
+                d.transitions[(old_v, new_v)] += 1
+                diffs.append(
+                    {
+                        "run_id": summary.run_id,
+                        "created_at": now,
+                        "check_id": row[0],
+                        "layer": col,
+                        "old_value": old_v,
+                        "new_value": new_v,
+                    }
+                )
+            if row_changed:
+                summary.rows_changed += 1
+                if apply:
+                    vals = {c: new[c][i] for c in DIFF_COLUMNS}
+                    missing = [LAYER_LABELS[c] for c in LAYERS if vals[c] is None]
+                    ok = vals["municipality"] is not None
+                    old_ok, old_conf = row[-2], row[-1]
+                    # Undo the not-ok floor first: geocoded confidence is >= 0.35, so a floored value was 0.0.
+                    base = 0.0 if (not old_ok and old_conf <= 0.1) else old_conf
+                    vals.update(
+                        id=row[0],
+                        ok=ok,
+                        reason=missing_reason(missing),
+                        confidence=result_confidence(base, ok),
+                    )
+                    updates.append(vals)
+
+        summary.rows_checked += len(rows)
+        if diffs:
+            session.execute(insert(CheckReclassification), diffs)
+        if updates:
+            # ORM bulk UPDATE by primary key (one executemany per chunk).
+            session.execute(update(CheckLog), updates)
+        session.commit()
+
+    return summary
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import mapping
+
+from .config import settings
+from .geo_layers import BoundaryLayer, FeatureStore
+
+# Tile key: (layer, dataset version, z, x, y)
+TileKey = Tuple[str, str, int, int, int]
+
+# Clip a little outside the tile so fills don't show seams between neighbouring tiles.
+_BUFFER_FRACTION = 1.0 / 64.0
+_TILE_PX = 256
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """lon/lat bounds (minx, miny, maxx, maxy) of a Web Mercator XYZ tile."""
+    n = 2.0**z
+
+    def lat(yy: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1.0 - 2.0 * yy / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+def render_tile(store: FeatureStore, z: int, x: int, y: int) -> bytes:
+    """Clip + simplify one layer snapshot to one tile and encode it as a GeoJSON FeatureCollection.
+
+    Each feature is emitted twice: its clipped area (kind=fill) and its clipped outline (kind=line).
+    Clipping the outline separately avoids drawing the artificial clip edges along tile borders.
+    """
+
+    minx, miny, maxx, maxy = tile_bounds(z, x, y)
+    # ~1 screen pixel at this zoom; coordinates are rounded to about a quarter pixel.
+    tol = min(maxx - minx, maxy - miny) / _TILE_PX
+    digits = max(0, math.ceil(-math.log10(tol / 4.0)))
+    bx = (maxx - minx) * _BUFFER_FRACTION
+    by = (maxy - miny) * _BUFFER_FRACTION
+    clip = (minx - bx, miny - by, maxx + bx, maxy + by)
+
+    def encode(geom: Any) -> Optional[Dict[str, Any]]:
+        geom = shapely.simplify(geom, tol, preserve_topology=True)
+        if geom.is_empty:
+            return None
+        geom = shapely.transform(geom, lambda c: np.round(c, digits))
+        return mapping(geom)
+
+    out: List[Dict[str, Any]] = []
+    for feat in store.features_in_bbox(clip):
+        geom = feat.geometry
+        props = {"name": feat.name}
+        fill = encode(shapely.clip_by_rect(geom, *clip))
+        if fill:
+            out.append({"type": "Feature", "properties": {**props, "kind": "fill"}, "geometry": fill})
+        line = encode(shapely.clip_by_rect(geom.boundary, *clip))
+        if line:
+            out.append({"type": "Feature", "properties": {**props, "kind": "line"}, "geometry": line})
+
+    fc = {"type": "FeatureCollection", "features": out}
+    return json.dumps(fc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class TileCache:
+    """In-memory LRU in front of an on-disk cache.
+
+    Disk tiles live under <dir>/<layer>/<version>/<z>/<x>/<y>.geojson; when a layer's version changes the
+    old version directories are removed the first time a tile of the new version is written.
+    """
+
+    def __init__(self, cache_dir: str, max_items: int = 512):
+        self.cache_dir = Path(cache_dir)
+        self.max_items = max_items
+        self._mem: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._swept: Set[Tuple[str, str]] = set()
+
+    def _path(self, key: TileKey) -> Path:
+        layer, version, z, x, y = key
+        return self.cache_dir / layer / version / str(z) / str(x) / f"{y}.geojson"
+
+    def _remember(self, key: TileKey, data: bytes) -> None:
+        with self._lock:
+            self._mem[key] = data
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_items:
+                self._mem.popitem(last=False)
+
+    def get(self, key: TileKey) -> Optional[bytes]:
+        with self._lock:
+            data = self._mem.get(key)
+            if data is not None:
+                self._mem.move_to_end(key)
+                return data
+        p = self._path(key)
+        if p.is_file():
+            data = p.read_bytes()
+            self._remember(key, data)
+            return data
+        return None
+
+    def put(self, key: TileKey, data: bytes) -> None:
+        self._remember(key, data)
+        layer, version = key[0], key[1]
+        if (layer, version) not in self._swept:
+            self._swept.add((layer, version))
+            layer_dir = self.cache_dir / layer
+            if layer_dir.is_dir():
+                for d in layer_dir.iterdir():
+                    if d.is_dir() and d.name != version:
+                        shutil.rmtree(d, ignore_errors=True)
+
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+
+
+TILE_CACHE = TileCache(settings.tile_cache_dir, settings.tile_cache_size)
+
+
+def get_tile(layer_key: str, layer: BoundaryLayer, z: int, x: int, y: int) -> Tuple[str, bytes]:
+    """Returns (dataset version, tile bytes), rendering and caching the tile on a miss.
+
+    Version and geometry come from one snapshot, so a concurrent reload can't cache new content under an
+    old (immutable) version.
+    """
+    snap = layer.snapshot()
+    key: TileKey = (layer_key, snap.version, z, x, y)
+    data = TILE_CACHE.get(key)
+    if data is None:
+        data = render_tile(snap, z, x, y)
+        TILE_CACHE.put(key, data)
+    return snap.version, data
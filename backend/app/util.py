@@ -1,9 +1,112 @@
 import re
+import unicodedata
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
 
 _ws = re.compile(r"\s+")
+_punct = re.compile(r"[^\w\s]+")
+_apos = re.compile(r"['\u2019`]")
+_postcode = re.compile(r"^\d{4}$")
 
 
 def normalize_address(s: str) -> str:
     s = (s or "").strip()
     s = _ws.sub(" ", s)
     return s
+
+
+# --- Canonical address key ---
+# Used for caching / dedupe only; the display form stays `normalize_address`.
+
+# Street types (SA Post Office / municipal abbreviations) -> full word.
+STREET_TYPES = {
+    "st": "street", "str": "street", "rd": "road", "ave": "avenue", "av": "avenue", "avn": "avenue",
+    "dr": "drive", "drv": "drive", "cres": "crescent", "cr": "crescent", "crs": "crescent",
+    "cl": "close", "ln": "lane", "pl": "place", "blvd": "boulevard", "hwy": "highway",
+    "ter": "terrace", "terr": "terrace", "sq": "square", "ct": "court", "crt": "court",
+    "pde": "parade", "gdns": "gardens", "grv": "grove", "gr": "grove", "wy": "way",
+    "esp": "esplanade", "mws": "mews", "cir": "circle", "ext": "extension", "est": "estate",
+    "ctr": "centre", "cntr": "centre", "bldg": "building", "cnr": "corner", "crnr": "corner",
+}
+
+# Directions, places and provinces commonly abbreviated in KZN addresses.
+PLACE_ABBREVIATIONS = {
+    "nth": "north", "sth": "south", "mt": "mount", "pt": "port", "dbn": "durban",
+    "pmb": "pietermaritzburg", "jhb": "johannesburg", "joburg": "johannesburg", "cpt": "cape town",
+    "pta": "pretoria", "umhl": "umhlanga",
+    "kzn": "kwazulu natal", "gp": "gauteng", "wc": "western cape", "ec": "eastern cape",
+}
+
+# Abbreviations that are a title when they start a name ("St Lucia", "Dr Pixley KaSeme St") and a street
+# type after one ("Smith St", "Ridge Dr").
+NAME_TITLES = {"st": "saint", "dr": "doctor"}
+
+# Trailing country and province tokens are dropped; every check is in South Africa (mostly KZN) anyway.
+_COUNTRY_SUFFIXES = [["south", "africa"], ["rsa"], ["za"]]
+_PROVINCE_SUFFIXES = [
+    ["kwazulu", "natal"], ["kwazulunatal"], ["kzn"], ["gauteng"], ["gp"], ["western", "cape"], ["wc"],
+    ["eastern", "cape"], ["ec"], ["northern", "cape"], ["free", "state"], ["limpopo"], ["mpumalanga"],
+]
+_TRAILING_SUFFIXES = _COUNTRY_SUFFIXES + _PROVINCE_SUFFIXES
+
+
+class CanonicalAddress(NamedTuple):
+    key: str
+    postcode: Optional[str]
+
+
+def _expand(tokens: List[str]) -> List[str]:
+    out: List[str] = []
+    for i, t in enumerate(tokens):
+        title = NAME_TITLES.get(t)
+        if title:
+            # Starts the name (first token or right after the house number) and a name follows.
+            prev = tokens[i - 1] if i else None
+            if i + 1 < len(tokens) and (prev is None or prev.isdigit()):
+                out.append(title)
+                continue
+        out.append(STREET_TYPES.get(t) or PLACE_ABBREVIATIONS.get(t) or t)
+    return out
+
+
+@lru_cache(maxsize=65536)
+def canonical_address(s: str) -> CanonicalAddress:
+    """Stable dedupe/cache key for an address.
+
+    Pipeline: unicode fold (accents dropped) + case fold, apostrophes dropped, other punctuation -> space, trailing country,
+    province and 4-digit postcode removed (postcode returned separately), abbreviation expansion per comma-separated part. For example
+    "12 Smith St., Durban, 4001" and "12 smith street durban" share the key "12 smith street durban".
+    """
+
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(c for c in s if not unicodedata.combining(c)).casefold()
+    s = _apos.sub("", s)
+    # Each comma-separated part is expanded on its own, so "12 Main Rd, St Lucia" reads St as a title.
+    parts = [p for p in (_punct.sub(" ", part).split() for part in s.split(",")) if p]
+    tokens = [t for p in parts for t in p]
+
+    # Country, province and postcode come off the end in any order ("Durban, 4001, KZN, South Africa").
+    postcode = None
+    while True:
+        suffix = next((x for x in _TRAILING_SUFFIXES if len(tokens) > len(x) and tokens[-len(x) :] == x), None)
+        if suffix:
+            del tokens[-len(suffix) :]
+        # A trailing 4-digit token is the postcode unless it is all there is (then it's a house number).
+        elif postcode is None and len(tokens) > 1 and _postcode.match(tokens[-1]):
+            postcode = tokens.pop()
+        else:
+            break
+
+    # Expand what is left part by part.
+    key: List[str] = []
+    n = len(tokens)
+    for p in parts:
+        if n <= 0:
+            break
+        key.extend(_expand(p[:n]))
+        n -= len(p)
+    return CanonicalAddress(key=" ".join(key), postcode=postcode)
+
+
+def address_key(s: str) -> str:
+    return canonical_address(s).key
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Set
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.db import engine, init_db
+from app.models import CheckLog
+from app.util import canonical_address, normalize_address
+
+
+# (address, expected key, expected postcode): known forms that must key the same way.
+_SANITY_CASES = [
+    ("12 Smith Street, Durban", "12 smith street durban", None),
+    ("12 smith st durban", "12 smith street durban", None),
+    ("12 Smith St., Durban, 4001", "12 smith street durban", "4001"),
+    ("12 Smith St, Durban, 4001, KZN", "12 smith street durban", "4001"),
+    ("12 Smith St, Durban, KwaZulu-Natal, 4001, South Africa", "12 smith street durban", "4001"),
+    ("12 Main Rd, St Lucia", "12 main road saint lucia", None),
+    ("12 Main Road, Saint Lucia", "12 main road saint lucia", None),
+    ("12 Dr Pixley KaSeme St, Durban", "12 doctor pixley kaseme street durban", None),
+    ("4 Ridge Dr, Dr Lee", "4 ridge drive doctor lee", None),
+    ("4001", "4001", None),
+]
+
+
+def _sanity_failures() -> List[Dict[str, Any]]:
+    out = []
+    for addr, key, postcode in _SANITY_CASES:
+        got = canonical_address(normalize_address(addr))
+        if (got.key, got.postcode) != (key, postcode):
+            out.append({"address": addr, "expected": [key, postcode], "got": [got.key, got.postcode]})
+    return out
+
+
+def _backfill(session: Session, chunk_size: int) -> int:
+    """Fill CheckLog.address_key / postal_code for rows logged before the columns existed."""
+    n = 0
+    last_id = 0
+    while True:
+        stmt = (
+            select(CheckLog.id, CheckLog.address)
+            .where(CheckLog.id > last_id, CheckLog.address_key.is_(None))
+            .order_by(CheckLog.id)
+            .limit(chunk_size)
+        )
+        rows = list(session.exec(stmt).all())
+        if not rows:
+            return n
+        last_id = rows[-1][0]
+        updates = []
+        for row_id, addr in rows:
+            c = canonical_address(normalize_address(addr))
+            updates.append({"id": row_id, "address_key": c.key, "postal_code": c.postcode})
+        session.execute(update(CheckLog), updates)
+        session.commit()
+        n += len(rows)
+
+
+def main(argv=None) -> int:
+    """Measure how canonical address keys collapse the logged history.
+
+    Reports distinct addresses under three keyings (display form, case-folded display form, canonical
+    key), i.e. how many extra cache/dedupe hits the canonical key buys, plus key throughput and the
+    largest merged groups so over-eager merges can be spotted. Known address forms are checked against
+    their expected key first; any mismatch is listed under sanity_failures and the exit status is 1.
+    --backfill first fills address_key for old rows.
+    """
+
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("--backfill", action="store_true", help="fill address_key/postal_code on existing rows")
+    ap.add_argument("--chunk-size", type=int, default=10000)
+    ap.add_argument("--top", type=int, default=10, help="largest merged groups to show")
+    args = ap.parse_args(argv)
+
+    init_db()
+    with Session(engine) as session:
+        if args.backfill:
+            print(f"Backfilled {_backfill(session, max(1, args.chunk_size))} rows", file=sys.stderr)
+
+        addresses: List[str] = [normalize_address(a) for a in session.exec(select(CheckLog.address)).all()]
+
+    display: Set[str] = set(addresses)
+    folded: Set[str] = {a.casefold() for a in addresses}
+
+    failures = _sanity_failures()
+    canonical_address.cache_clear()
+    t0 = time.perf_counter()
+    keys = [canonical_address(a).key for a in addresses]
+    cold_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for a in addresses:
+        canonical_address(a)
+    warm_s = time.perf_counter() - t0
+
+    groups: Dict[str, Set[str]] = defaultdict(set)
+    for a, k in zip(addresses, keys):
+        groups[k].add(a)
+
+    rows = len(addresses)
+
+    def hit_rate(distinct: int) -> float:
+        # Share of checks that a cache keyed this way would have answered (all but the first of each key).
+        return round(1.0 - distinct / rows, 4) if rows else 0.0
+
+    merged = sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+    report = {
+        "rows": rows,
+        "distinct": {"display": len(display), "casefold": len(folded), "canonical": len(groups)},
+        "hit_rate": {
+            "display": hit_rate(len(display)),
+            "casefold": hit_rate(len(folded)),
+            "canonical": hit_rate(len(groups)),
+        },
+        # Keys that merged more than one distinct display form.
+        "colliding_keys": len(merged),
+        "keys_per_s": {
+            "cold": round(rows / cold_s) if cold_s else None,
+            "warm": round(rows / warm_s) if warm_s else None,
+        },
+        "top_merged": [sorted(g)[:10] for g in merged[: args.top]],
+        "sanity_failures": failures,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        raise SystemExit(1)
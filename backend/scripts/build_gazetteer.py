@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import time
+
+from app.config import settings
+from app.gazetteer import build_index
+
+
+def main() -> int:
+    """Build the offline address index from data/gazetteer/* (CSV / GeoJSON / ESRI JSON address points).
+
+    Writes settings.gazetteer_db_path (default data/gazetteer.sqlite). Safe to re-run while the API is up:
+    the new index is swapped in atomically.
+    """
+
+    src = Path(settings.gazetteer_dir)
+    src.mkdir(parents=True, exist_ok=True)
+
+    print(f"Indexing address points from {src}…")
+    t0 = time.perf_counter()
+    n = build_index(str(src), settings.gazetteer_db_path)
+    dt = time.perf_counter() - t0
+    print(f"  ✓ {n} addresses -> {settings.gazetteer_db_path} ({dt:.1f}s)")
+    if n == 0:
+        print("  (no address points found; see data/gazetteer/README.md for the expected columns)")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        raise SystemExit(1)
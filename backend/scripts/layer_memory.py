@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from shapely.prepared import prep
+
+from app.geo_layers import BoundaryLayer, FeatureStore, read_rows
+from app.layers import LAYERS
+
+
+@dataclass(frozen=True)
+class _PerFeatureObject:
+    # The previous layout: one frozen dataclass per polygon part.
+    name: str
+    extras: Dict[str, Any]
+    prepared: Any
+    bbox: Tuple[float, float, float, float]
+
+
+def _load_per_feature(layer: BoundaryLayer) -> List[_PerFeatureObject]:
+    """The previous BoundaryLayer.load(): same file parsing, so the same name/extras sharing
+    (one name string and extras dict per source feature, shared by all of an ESRI feature's parts)."""
+    rows, _ = read_rows(layer.folder, layer.name_keys, layer.extras_keys)
+    return [_PerFeatureObject(name=n, extras=e, prepared=prep(g), bbox=g.bounds) for n, e, g in rows]
+
+
+def _load_columnar(layer: BoundaryLayer) -> FeatureStore:
+    rows, version = read_rows(layer.folder, layer.name_keys, layer.extras_keys)
+    return FeatureStore(rows, version=version)
+
+
+def _retained_bytes(load: Callable[[], Any]) -> int:
+    """Python heap still held after `load()` returns (parse temporaries already freed)."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = load()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def main() -> int:
+    """Report per-feature memory of each BoundaryLayer: one object per part (before) vs columnar (after).
+
+    Both layouts are loaded from the same files and measured the same way, with tracemalloc around the
+    whole load. GEOS coordinate memory is outside the Python heap (and identical in both layouts), so
+    these are the Python-side costs per polygon part, including the shapely wrapper objects.
+    """
+
+    out: Dict[str, Any] = {}
+    for key, layer in LAYERS.items():
+        n = len(layer)
+        before = _retained_bytes(lambda: _load_per_feature(layer))
+        after = _retained_bytes(lambda: _load_columnar(layer))
+        out[key] = {
+            "features": n,
+            "before_bytes_per_feature": round(before / n, 1) if n else 0.0,
+            "after_bytes_per_feature": round(after / n, 1) if n else 0.0,
+            "columnar_breakdown": layer.memory_report(),
+        }
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        raise SystemExit(1)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+
+from sqlmodel import Session
+
+from app.db import engine, init_db
+from app.reclassify import reclassify_history
+
+
+def main(argv=None) -> int:
+    """Re-classify every logged check against the current data/* layers and print a per-layer diff.
+
+    Run after refreshing datasets. By default this only records the differences (table
+    checkreclassification); pass --apply to also update the stored CheckLog rows.
+    """
+
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("--apply", action="store_true", help="update CheckLog rows to the new classification")
+    ap.add_argument("--chunk-size", type=int, default=5000)
+    args = ap.parse_args(argv)
+
+    init_db()
+    t0 = time.perf_counter()
+    with Session(engine) as session:
+        summary = reclassify_history(session, chunk_size=max(1, args.chunk_size), apply=args.apply)
+    dt = time.perf_counter() - t0
+
+    print(json.dumps(summary.as_dict(), indent=2, ensure_ascii=False))
+    print(f"{summary.rows_changed}/{summary.rows_checked} rows classify differently ({dt:.1f}s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        raise SystemExit(1)
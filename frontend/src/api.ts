@@ -1,4 +1,4 @@
-import type { CheckRequest, CheckResult, CheckLog } from "./types";
+import type { CheckRequest, CheckResult, CheckLog, TileLayers } from "./types";
 
 export async function apiCheck(payload: CheckRequest): Promise<CheckResult> {
   const r = await fetch("/api/check", {
@@ -15,3 +15,9 @@ export async function apiHistory(limit = 25): Promise<CheckLog[]> {
   if (!r.ok) throw new Error(await r.text());
   return (await r.json()) as CheckLog[];
 }
+
+export async function apiTileLayers(): Promise<TileLayers> {
+  const r = await fetch("/api/tiles");
+  if (!r.ok) throw new Error(await r.text());
+  return (await r.json()) as TileLayers;
+}
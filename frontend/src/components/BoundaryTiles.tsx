@@ -0,0 +1,126 @@
+import L from "leaflet";
+import { createElementObject, createLayerComponent, type LayerProps } from "@react-leaflet/core";
+
+// Leaflet has no built-in tiled GeoJSON layer: this one fetches /api/tiles/{layer}/{z}/{x}/{y}.geojson
+// for the visible tiles and keeps one L.GeoJSON per tile. The browser HTTP cache does the rest
+// (tile URLs carry the dataset version and are served as immutable).
+
+type TileOptions = {
+  url: string;
+  maxNativeZoom: number;
+  color: string;
+};
+
+type LoadedTile = { layer?: L.GeoJSON; abort: AbortController };
+
+function lon2tile(lon: number, z: number) {
+  return Math.floor(((lon + 180) / 360) * 2 ** z);
+}
+
+function lat2tile(lat: number, z: number) {
+  const r = (lat * Math.PI) / 180;
+  return Math.floor(((1 - Math.asinh(Math.tan(r)) / Math.PI) / 2) * 2 ** z);
+}
+
+class GeoJSONTileLayer extends L.LayerGroup {
+  private opts: TileOptions;
+  private tiles = new Map<string, LoadedTile>();
+
+  constructor(opts: TileOptions) {
+    super();
+    this.opts = opts;
+  }
+
+  onAdd(map: L.Map) {
+    super.onAdd(map);
+    map.on("moveend", this.update, this);
+    this.update();
+    return this;
+  }
+
+  onRemove(map: L.Map) {
+    map.off("moveend", this.update, this);
+    this.reset();
+    super.onRemove(map);
+    return this;
+  }
+
+  setOptions(opts: TileOptions) {
+    const changed = opts.url !== this.opts.url || opts.color !== this.opts.color;
+    this.opts = opts;
+    if (changed) {
+      this.reset();
+      this.update();
+    }
+  }
+
+  private reset() {
+    for (const t of this.tiles.values()) {
+      t.abort.abort();
+      if (t.layer) this.removeLayer(t.layer);
+    }
+    this.tiles.clear();
+  }
+
+  private update() {
+    const map = (this as any)._map as L.Map | undefined;
+    if (!map) return;
+    const z = Math.max(0, Math.min(this.opts.maxNativeZoom, Math.floor(map.getZoom())));
+    const b = map.getBounds();
+    const n = 2 ** z;
+    const x0 = Math.max(0, lon2tile(b.getWest(), z));
+    const x1 = Math.min(n - 1, lon2tile(b.getEast(), z));
+    const y0 = Math.max(0, lat2tile(b.getNorth(), z));
+    const y1 = Math.min(n - 1, lat2tile(b.getSouth(), z));
+
+    const wanted = new Set<string>();
+    for (let x = x0; x <= x1; x++) {
+      for (let y = y0; y <= y1; y++) wanted.add(`${z}/${x}/${y}`);
+    }
+
+    for (const [key, t] of this.tiles) {
+      if (wanted.has(key)) continue;
+      t.abort.abort();
+      if (t.layer) this.removeLayer(t.layer);
+      this.tiles.delete(key);
+    }
+
+    for (const key of wanted) {
+      if (!this.tiles.has(key)) this.load(key);
+    }
+  }
+
+  private load(key: string) {
+    const [z, x, y] = key.split("/");
+    const url = this.opts.url.replace("{z}", z).replace("{x}", x).replace("{y}", y);
+    const t: LoadedTile = { abort: new AbortController() };
+    this.tiles.set(key, t);
+
+    const color = this.opts.color;
+    fetch(url, { signal: t.abort.signal })
+      .then((r) => (r.ok ? r.json() : null))
+      .then((data) => {
+        if (!data || this.tiles.get(key) !== t) return;
+        t.layer = L.geoJSON(data, {
+          interactive: false,
+          style: (f) =>
+            f?.properties?.kind === "line"
+              ? { color, weight: 2, opacity: 0.9, fill: false }
+              : { stroke: false, fillColor: color, fillOpacity: 0.08 }
+        });
+        this.addLayer(t.layer);
+      })
+      .catch(() => {
+        // aborted or network error; tile stays empty
+      });
+  }
+}
+
+export const BoundaryTiles = createLayerComponent<GeoJSONTileLayer, LayerProps & TileOptions>(
+  function createBoundaryTiles({ url, maxNativeZoom, color }, ctx) {
+    return createElementObject(new GeoJSONTileLayer({ url, maxNativeZoom, color }), ctx);
+  },
+  function updateBoundaryTiles(instance, { url, maxNativeZoom, color }) {
+    instance.setOptions({ url, maxNativeZoom, color });
+  }
+);
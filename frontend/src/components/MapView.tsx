@@ -1,7 +1,9 @@
-import React from "react";
-import { MapContainer, TileLayer, Marker, Popup } from "react-leaflet";
+import React, { useEffect, useState } from "react";
+import { MapContainer, TileLayer, Marker, Popup, LayersControl } from "react-leaflet";
 import L from "leaflet";
-import type { CheckResult } from "../types";
+import { apiTileLayers } from "../api";
+import type { CheckResult, TileLayers } from "../types";
+import { BoundaryTiles } from "./BoundaryTiles";
 import "leaflet/dist/leaflet.css";
 
 // Leaflet default marker icons don't bundle well in Vite; use CDN URLs.
@@ -14,7 +16,21 @@ const DefaultIcon = L.icon({
 });
 L.Marker.prototype.options.icon = DefaultIcon;
 
+const OVERLAYS: { key: string; label: string; color: string; checked: boolean }[] = [
+  { key: "municipality", label: "Municipality", color: "#2563eb", checked: true },
+  { key: "nsc_region", label: "NSC", color: "#dc2626", checked: true },
+  { key: "mpr_region", label: "MPR", color: "#16a34a", checked: false },
+  { key: "custom_region", label: "Custom", color: "#9333ea", checked: false }
+];
+
 export function MapView({ result }: { result: CheckResult | null }) {
+  const [tiles, setTiles] = useState<TileLayers | null>(null);
+
+  // Fetched on every mount so tile URLs pick up the current dataset version after a refresh.
+  useEffect(() => {
+    apiTileLayers().then(setTiles).catch(() => setTiles(null));
+  }, []);
+
   const lat = result?.lat ?? null;
   const lon = result?.lon ?? null;
   if (lat === null || lon === null) return null;
@@ -28,6 +44,19 @@ export function MapView({ result }: { result: CheckResult | null }) {
             attribution='&copy; OpenStreetMap contributors'
             url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
           />
+          {tiles ? (
+            <LayersControl position="topright">
+              {OVERLAYS.filter((o) => tiles.layers[o.key]).map((o) => (
+                <LayersControl.Overlay key={o.key} name={o.label} checked={o.checked}>
+                  <BoundaryTiles
+                    url={tiles.layers[o.key].url}
+                    maxNativeZoom={tiles.layers[o.key].max_zoom}
+                    color={o.color}
+                  />
+                </LayersControl.Overlay>
+              ))}
+            </LayersControl>
+          ) : null}
           <Marker position={[lat, lon]}>
             <Popup>
               <div style={{ fontSize: 12 }}>
@@ -17,3 +17,13 @@ export type CheckLog = Record<string, any> & {
   created_at: string;
   address: string;
 };
+
+export type TileLayerInfo = {
+  version: string;
+  url: string;
+  max_zoom: number;
+};
+
+export type TileLayers = {
+  layers: Record<string, TileLayerInfo>;
+};